@@ -1154,17 +1154,25 @@ def create_file_list(
             continue
         if any(parent in exclude_paths for parent in Path(cur_dir).parents):
             continue
+        # Only files that get past the cheap checks need the glob decision.
+        candidates: list[tuple[str, str]] = []
         for file in files:
             cur_path = os.path.join(cur_dir, file)
             rel_path = relpath(cur_path, path)
 
             if Path(cur_path) in exclude_paths:
                 continue
-            if keep_manifest_specified_file(rel_path, exclude_paths | directories_to_ignore) and (
-                rel_path in extra_files or not glob_set.matches(cur_path)
-            ):
-                path_to_add = abspath(cur_path) if use_abspath else rel_path
-                file_set.add(path_to_add)
+            if not keep_manifest_specified_file(rel_path, exclude_paths | directories_to_ignore):
+                continue
+            if rel_path in extra_files:
+                file_set.add(abspath(cur_path) if use_abspath else rel_path)
+            else:
+                candidates.append((cur_path, rel_path))
+
+        excluded = glob_set.matches_many([cur_path for cur_path, _ in candidates])
+        for (cur_path, rel_path), is_excluded in zip(candidates, excluded):
+            if not is_excluded:
+                file_set.add(abspath(cur_path) if use_abspath else rel_path)
 
     return sorted(file_set)
 
@@ -2547,7 +2547,7 @@ def remove_content_build(
 @server_args
 @click.option(
     "--status",
-    type=click.Choice(BuildStatus._all),
+    type=click.Choice([status.value for status in BuildStatus]),
     help="Filter results by status of the build operation.",
 )
 @click.option(
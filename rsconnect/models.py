@@ -4,14 +4,15 @@ Data models
 
 from __future__ import annotations
 
+import enum
 import fnmatch
+import functools
 import pathlib
 import re
 import sys
-from typing import Callable, Literal, Optional, cast
+from typing import Callable, Literal, Optional, Sequence, cast
 
 import click
-import semver
 from click import ParamType
 from click.types import StringParamType
 
@@ -23,18 +24,29 @@ if sys.version_info >= (3, 11):
 else:
     from typing_extensions import TypedDict
 
-_version_search_pattern = r"(^[=><]{0,2})(.*)"
-_content_guid_pattern = r"([^,]*),?(.*)"
+_glob_wildcard_pattern = re.compile(r"[*?[]")
+_version_search_pattern = re.compile(r"(^[=><]{0,2})(.*)")
+_valid_comparators = frozenset((">", "<", ">=", "<=", "=", "=="))
 
+# The same grammar semver.parse() validates against, so a version can be checked
+# without building a VersionInfo.
+_semver_pattern = re.compile(
+    r"(0|[1-9]\d*)\.(0|[1-9]\d*)\.(0|[1-9]\d*)"
+    r"(?:-(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*)(?:\.(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*))*)?"
+    r"(?:\+[0-9a-zA-Z-]+(?:\.[0-9a-zA-Z-]+)*)?$"
+)
 
-class BuildStatus:
+
+class BuildStatus(str, enum.Enum):
     NEEDS_BUILD = "NEEDS_BUILD"  # marked for build
     RUNNING = "RUNNING"  # running now
     ABORTED = "ABORTED"  # cancelled while running
     COMPLETE = "COMPLETE"  # completed successfully
     ERROR = "ERROR"  # completed with an error
 
-    _all = [NEEDS_BUILD, RUNNING, ABORTED, COMPLETE, ERROR]
+    def __str__(self):
+        # Statuses are persisted with str(), so keep that as the bare value.
+        return self.value
 
 
 class AppMode:
@@ -43,6 +55,8 @@ class AppMode:
     Connect
     """
 
+    __slots__ = ("_ordinal", "_name", "_text", "_ext")
+
     def __init__(
         self,
         ordinal: int,
@@ -67,11 +81,19 @@ class AppMode:
     def extension(self):
         return self._ext
 
+    def __eq__(self, other: object):
+        if not isinstance(other, AppMode):
+            return NotImplemented
+        return self._ordinal == other._ordinal
+
+    def __hash__(self):
+        return hash(self._ordinal)
+
     def __str__(self):
-        return self.name()
+        return self._name
 
     def __repr__(self):
-        return self.desc()
+        return self._text
 
 
 class AppModes:
@@ -150,48 +172,48 @@ class AppModes:
         "bokeh": BOKEH_APP,
     }
 
+    _by_ordinal = {mode._ordinal: mode for mode in _modes}
+    _by_name = {mode._name: mode for mode in _modes}
+    _by_extension = {mode._ext: mode for mode in _modes if mode._ext is not None}
+
     @classmethod
     def get_by_ordinal(cls, ordinal: int, return_unknown: bool = False) -> AppMode:
         """Get an AppMode by its associated ordinal (integer)"""
-        return cls._find_by(
-            lambda mode: mode.ordinal() == ordinal,
-            "with ordinal %s" % ordinal,
-            return_unknown,
-        )
+        mode = cls._by_ordinal.get(ordinal)
+        if mode is not None:
+            return mode
+        if return_unknown:
+            return cls.UNKNOWN
+        raise ValueError("No app mode with ordinal %s" % ordinal)
 
     @classmethod
     def get_by_name(cls, name: str, return_unknown: bool = False) -> AppMode:
         """Get an AppMode by name"""
-        return cls._find_by(lambda mode: mode.name() == name, "named %s" % name, return_unknown)
+        mode = cls._by_name.get(name)
+        if mode is not None:
+            return mode
+        if return_unknown:
+            return cls.UNKNOWN
+        raise ValueError("No app mode named %s" % name)
 
     @classmethod
     def get_by_extension(cls, extension: Optional[str], return_unknown: bool = False) -> AppMode:
         """Get an app mode by its associated extension"""
-        # We can't allow a lookup by None since some modes have that for an extension.
+        # We can't allow a lookup by None since some modes have that for an extension;
+        # the extension map never contains a None key.
+        mode = cls._by_extension.get(extension)
+        if mode is not None:
+            return mode
+        if return_unknown:
+            return cls.UNKNOWN
         if extension is None:
-            if return_unknown:
-                return cls.UNKNOWN
             raise ValueError("No app mode with extension %s" % extension)
-
-        return cls._find_by(
-            lambda mode: mode.extension() == extension,
-            "with extension: %s" % extension,
-            return_unknown,
-        )
+        raise ValueError("No app mode with extension: %s" % extension)
 
     @classmethod
     def get_by_cloud_name(cls, name: str) -> AppMode:
         return cls._cloud_to_connect_modes.get(name, cls.UNKNOWN)
 
-    @classmethod
-    def _find_by(cls, predicate: Callable[[AppMode], bool], message: str, return_unknown: bool) -> AppMode:
-        for mode in cls._modes:
-            if predicate(mode):
-                return mode
-        if return_unknown:
-            return cls.UNKNOWN
-        raise ValueError("No app mode %s" % message)
-
 
 class GlobMatcher(object):
     """
@@ -203,26 +225,50 @@ class GlobMatcher(object):
         pattern = pathlib.PurePath(pattern).as_posix()
         if pattern.endswith("/**/*"):
             # Note: the index used here makes sure the pattern has a trailing
-            # slash.  We want that.
+            # slash.  We want that.  The prefix stays Posix-style since every
+            # path is converted with `as_posix()` before it is compared.
             self._pattern = pattern[:-4]
             self.matches = self._match_with_starts_with
+            self.matches_parts = self._match_parts_with_starts_with
+            self._cost = 0
+        elif pattern.endswith("/**") and not _glob_wildcard_pattern.search(pattern, 0, len(pattern) - 3):
+            # A trailing `**` matches everything below the directory, and (as in the
+            # general case) the directory itself.
+            self._pattern = pattern[:-2]
+            self._directory = pattern[:-3]
+            self.matches = self._match_with_directory
+            self.matches_parts = self._match_parts_with_directory
+            self._cost = 0
+        elif not _glob_wildcard_pattern.search(pattern):
+            # No wildcards at all, so the whole pattern is a plain path comparison.
+            self._pattern = pattern
+            self.matches = self._match_equals
+            self.matches_parts = self._match_parts_equals
+            self._cost = 1
         else:
-            self._pattern_parts: list[str | re.Pattern[str]]
+            self._pattern_parts: tuple[str | re.Pattern[str], ...]
             self._wildcard_index: int | None
             self._pattern_parts, self._wildcard_index = self._to_parts_list(pattern)
+            # Resolve each segment to its comparison up front so matching doesn't
+            # have to inspect the segment type for every path part.
+            self._part_matchers: tuple[Callable[[str], object], ...] = tuple(
+                part.__eq__ if isinstance(part, str) else part.match for part in self._pattern_parts
+            )
             self.matches = self._match_with_list_parts
+            self.matches_parts = self._match_parts_with_list_parts
+            self._cost = 2
 
     @staticmethod
-    def _to_parts_list(pattern: str) -> tuple[list[str | re.Pattern[str]], int | None]:
+    def _to_parts_list(pattern: str) -> tuple[tuple[str | re.Pattern[str], ...], int | None]:
         """
-        Converts a glob expression into a list, with an entry for each directory
+        Converts a glob expression into a tuple, with an entry for each directory
         level.  Each entry will be either a string, in which case an equality
         check for that directory entry, or a regular expression, in which case
         matching will be used.  The string, '**', is special but we don't alter
         it here.  We do return its index.
 
         :param pattern: the glob pattern to pull apart.
-        :return: a list of pattern pieces and the index of the special '**' pattern.
+        :return: a tuple of pattern pieces and the index of the special '**' pattern.
         The index will be None if `**` is never found.
         """
         # Incoming pattern is ALWAYS a Posix-style path.
@@ -235,44 +281,62 @@ class GlobMatcher(object):
                 if depth_wildcard_index is not None:
                     raise ValueError('Only one occurrence of the "**" pattern is allowed.')
                 depth_wildcard_index = index
-            elif any(ch in name for ch in "*?["):
+            elif _glob_wildcard_pattern.search(name):
                 value = re.compile(r"\A" + fnmatch.translate(name))
             parts_result.append(value)
 
-        return parts_result, depth_wildcard_index
+        return tuple(parts_result), depth_wildcard_index
+
+    # The `matches_parts` variants take a path that has already been converted
+    # to Posix form, along with that path split on "/".  This lets `GlobSet`
+    # normalize and split a path once rather than once per pattern.  Each
+    # variant ignores whichever argument it doesn't need.
+
+    def _match_equals(self, path: str | pathlib.PurePath):
+        return pathlib.PurePath(path).as_posix() == self._pattern
+
+    def _match_parts_equals(self, path: str, parts: list[str]):
+        return path == self._pattern
 
     def _match_with_starts_with(self, path: str | pathlib.PurePath):
-        path = pathlib.PurePath(path).as_posix()
+        return pathlib.PurePath(path).as_posix().startswith(self._pattern)
+
+    def _match_parts_with_starts_with(self, path: str, parts: list[str]):
         return path.startswith(self._pattern)
 
+    def _match_with_directory(self, path: str | pathlib.PurePath):
+        return self._match_parts_with_directory(pathlib.PurePath(path).as_posix(), [])
+
+    def _match_parts_with_directory(self, path: str, parts: list[str]):
+        return path.startswith(self._pattern) or path == self._directory
+
     def _match_with_list_parts(self, path: str | pathlib.PurePath):
         path = pathlib.PurePath(path).as_posix()
-        parts = path.split("/")
-
-        def items_match(i1: int, i2: int):
-            if i2 >= len(parts):
-                return False
-            part1 = self._pattern_parts[i1]
-            if isinstance(part1, str):
-                return self._pattern_parts[i1] == parts[i2]
-            return part1.match(parts[i2]) is not None
+        return self._match_parts_with_list_parts(path, path.split("/"))
 
-        wildcard_index = len(self._pattern_parts) if self._wildcard_index is None else self._wildcard_index
+    def _match_parts_with_list_parts(self, path: str, parts: list[str]):
+        part_matchers = self._part_matchers
+        parts_len = len(parts)
+        pattern_len = len(part_matchers)
+        depth_wildcard_index = self._wildcard_index
+        wildcard_index = pattern_len if depth_wildcard_index is None else depth_wildcard_index
 
         # Top-down...
+        if wildcard_index > parts_len:
+            return False
         for index in range(wildcard_index):
-            if not items_match(index, index):
+            if not part_matchers[index](parts[index]):
                 return False
 
-        if self._wildcard_index is None:
-            return len(self._pattern_parts) == len(parts)
+        if depth_wildcard_index is None:
+            return pattern_len == parts_len
 
         # Now, bottom-up...
-        pattern_index = len(self._pattern_parts) - 1
-        part_index = len(parts) - 1
+        pattern_index = pattern_len - 1
+        part_index = parts_len - 1
 
         while pattern_index > wildcard_index and part_index >= 0:
-            if not items_match(pattern_index, part_index):
+            if not part_matchers[pattern_index](parts[part_index]):
                 return False
             pattern_index = pattern_index - 1
             part_index = part_index - 1
@@ -280,13 +344,25 @@ class GlobMatcher(object):
         return pattern_index == wildcard_index
 
 
+@functools.lru_cache(maxsize=1024)
+def _get_glob_matcher(pattern: str) -> GlobMatcher:
+    """
+    Returns a `GlobMatcher` for the given pattern.  Matchers are immutable once
+    built, so identical patterns share a single compiled instance.
+    """
+    return GlobMatcher(pattern)
+
+
 class GlobSet(object):
     """
     Matches against a set of `GlobMatcher` patterns
     """
 
     def __init__(self, patterns: list[str]):
-        self._matchers = [GlobMatcher(pattern) for pattern in patterns]
+        # Cheapest matchers go first so `matches` can short-circuit early; the
+        # starts-with matchers also tend to be the directory excludes that hit most.
+        matchers = [_get_glob_matcher(pattern) for pattern in patterns]
+        self._matchers = sorted(matchers, key=lambda matcher: matcher._cost)
 
     def matches(self, path: str):
         """
@@ -296,7 +372,30 @@ class GlobSet(object):
         :param path: the path to test.
         :return: True, if the given path matches any of our glob patterns.
         """
-        return any(matcher.matches(path) for matcher in self._matchers)
+        return self.matches_many([path])[0]
+
+    def matches_many(self, paths: Sequence[str]) -> list[bool]:
+        """
+        Determines, for each of the given paths, whether it is matched by any
+        of our glob expressions.
+
+        :param paths: the paths to test.
+        :return: a list with one entry per path; True if that path matches any
+        of our glob patterns.
+        """
+        matchers = [matcher.matches_parts for matcher in self._matchers]
+        pure_path = pathlib.PurePath
+        result: list[bool] = []
+        for path in paths:
+            path = pure_path(path).as_posix()
+            parts = path.split("/")
+            matched = False
+            for matches_parts in matchers:
+                if matches_parts(path, parts):
+                    matched = True
+                    break
+            result.append(matched)
+        return result
 
 
 # Strip quotes from string arguments that might be passed in by jq
@@ -320,6 +419,29 @@ class ContentGuidWithBundle(object):
         return self.guid
 
 
+@functools.lru_cache(maxsize=256)
+def _parse_content_guid(value: str) -> tuple[str, str | None]:
+    """
+    Splits a "guid[,bundle_id]" argument into its parts.  Results are cached
+    since scripts tend to pass the same arguments over and over.
+
+    :param value: the argument to parse, with any quotes already stripped.
+    :return: the guid and the bundle ID (None if one wasn't given).
+    :raises ValueError: if the bundle ID isn't an integer.
+    """
+    guid, _, bundle_id = value.partition(",")
+    # The bundle ID ends at the first newline, as it did when this was parsed
+    # with a regular expression.
+    bundle_id = bundle_id.partition("\n")[0]
+    if not bundle_id:
+        return guid, None
+    try:
+        int(bundle_id)
+    except ValueError:
+        raise ValueError("Failed to parse bundle_id. Expected Int, but found: %s" % bundle_id)
+    return guid, bundle_id
+
+
 class ContentGuidWithBundleParamType(StrippedStringParamType):
     name = "ContentGuidWithBundle"
 
@@ -333,16 +455,11 @@ class ContentGuidWithBundleParamType(StrippedStringParamType):
             return value
         if isinstance(value, str):
             value = super(ContentGuidWithBundleParamType, self).convert(value, param, ctx)
-            m = re.match(_content_guid_pattern, value)
-            if m is not None:
-                guid_with_bundle = ContentGuidWithBundle(m.group(1))
-                if len(m.groups()) == 2 and len(m.group(2)) > 0:
-                    try:
-                        int(m.group(2))
-                    except ValueError:
-                        self.fail("Failed to parse bundle_id. Expected Int, but found: %s" % m.group(2))
-                    guid_with_bundle.bundle_id = m.group(2)
-                return guid_with_bundle
+            try:
+                guid, bundle_id = _parse_content_guid(value)
+            except ValueError as e:
+                self.fail(str(e))
+            return ContentGuidWithBundle(guid, bundle_id)
         self.fail("Failed to parse content guid arg %s" % value)
 
 
@@ -475,6 +592,33 @@ class VersionSearchFilter(object):
         return "%s %s %s" % (self.name, self.comp, self.vers)
 
 
+@functools.lru_cache(maxsize=256)
+def _parse_version_filter(value: str) -> tuple[ComparisonOperator, str]:
+    """
+    Splits a version filter like ">=3.8.0" into its comparator and version.
+    Results are cached since scripts tend to pass the same filters over and over.
+
+    :param value: the filter to parse.
+    :return: the comparator (defaulting to "==") and the version.
+    :raises ValueError: if the comparator or the version isn't valid.
+    """
+    m = _version_search_pattern.match(value)
+    if m is None:
+        raise ValueError("Failed to parse version filter %s" % value)
+
+    # default to == if no comparator was provided
+    comp = m.group(1) or "=="
+    vers = m.group(2)
+
+    if comp not in _valid_comparators:
+        raise ValueError("Failed to parse verison filter: %s is not a valid comparitor" % comp)
+
+    if _semver_pattern.match(vers) is None:
+        raise ValueError("Failed to parse version info: %s" % vers)
+
+    return cast(ComparisonOperator, comp), vers
+
+
 class VersionSearchFilterParamType(ParamType):
     name = "VersionSearchFilter"
 
@@ -495,26 +639,12 @@ class VersionSearchFilterParamType(ParamType):
             return value
 
         if isinstance(value, str):
-            m = re.match(_version_search_pattern, value)
-            if m is not None and len(m.groups()) == 2:
-                version_search = VersionSearchFilter(
-                    name=self.key,
-                    comp=cast(ComparisonOperator, m.group(1)),
-                    vers=m.group(2),
-                )
-
-                # default to == if no comparator was provided
-                if not version_search.comp:
-                    version_search.comp = "=="
-
-                if version_search.comp not in [">", "<", ">=", "<=", "=", "=="]:
-                    self.fail("Failed to parse verison filter: %s is not a valid comparitor" % version_search.comp)
-
-                try:
-                    semver.parse(version_search.vers)  # pyright: ignore[reportUnknownMemberType]
-                except ValueError:
-                    self.fail("Failed to parse version info: %s" % version_search.vers)
-                return version_search
+            try:
+                comp, vers = _parse_version_filter(value)
+            except ValueError as e:
+                self.fail(str(e))
+            # A new filter each time, so callers never share the parsed result.
+            return VersionSearchFilter(name=self.key, comp=comp, vers=vers)
 
         self.fail("Failed to parse version filter %s" % value)
 
@@ -180,8 +180,8 @@ class TestBundle(TestCase):
 
             reqs = tar.extractfile("requirements.txt").read()
 
-            # these are the dependencies declared in our setup.py
-            self.assertIn(b"six", reqs)
+            # these are the dependencies declared in our pyproject.toml
+            self.assertIn(b"semver", reqs)
 
             manifest = json.loads(tar.extractfile("manifest.json").read().decode("utf-8"))
 
@@ -55,7 +55,7 @@ class TestEnvironment(TestCase):
         result = detect_environment(get_dir("pip2"))
 
         # these are the dependencies declared in our pyproject.toml
-        self.assertIn("six", result.contents)
+        self.assertIn("semver", result.contents)
         self.assertIn("click", result.contents.lower())
 
         self.assertTrue(version_re.match(result.pip))
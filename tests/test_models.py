@@ -1,8 +1,23 @@
+import json
 import os
+import sys
 
-from unittest import TestCase
+from unittest import TestCase, skipIf
 
-from rsconnect.models import AppMode, AppModes, GlobMatcher
+import click
+
+from rsconnect.models import (
+    AppMode,
+    AppModes,
+    BuildStatus,
+    ContentGuidWithBundle,
+    ContentGuidWithBundleParamType,
+    GlobMatcher,
+    GlobSet,
+    VersionSearchFilter,
+    VersionSearchFilterParamType,
+    _parse_version_filter,
+)
 
 
 class TestModels(TestCase):
@@ -23,6 +38,13 @@ class TestModels(TestCase):
         self.assertEqual(mode.desc(), "Testing (again)")
         self.assertEqual(mode.extension(), ".ipynb")
 
+    def test_app_mode_hashing(self):
+        self.assertEqual(AppMode(1, "shiny", "Shiny App", ".R"), AppModes.SHINY)
+        self.assertNotEqual(AppModes.SHINY, AppModes.RMD)
+        self.assertNotEqual(AppModes.SHINY, "shiny")
+        self.assertIn(AppMode(1, "shiny", "Shiny App", ".R"), {AppModes.SHINY, AppModes.PLUMBER})
+        self.assertEqual(len(set(AppModes._modes)), len(AppModes._modes))
+
     def test_app_modes_constants(self):
         defined = list(filter(lambda n: n.isupper(), AppModes.__dict__.keys()))
         modes = list(AppModes._modes)
@@ -51,6 +73,13 @@ class TestModels(TestCase):
                 self.assertNotIn(mode.extension(), extensions)
                 ordinals.append(mode.extension())
 
+    def test_lookups_cover_all_modes(self):
+        for mode in AppModes._modes:
+            self.assertIs(AppModes.get_by_ordinal(mode.ordinal()), mode)
+            self.assertIs(AppModes.get_by_name(mode.name()), mode)
+            if mode.extension() is not None:
+                self.assertIs(AppModes.get_by_extension(mode.extension()), mode)
+
     def test_get_by_ordinal(self):
         self.assertIs(AppModes.get_by_ordinal(1), AppModes.SHINY)
         self.assertIs(AppModes.get_by_ordinal(-1, True), AppModes.UNKNOWN)
@@ -78,10 +107,10 @@ class TestModels(TestCase):
         self.assertIs(AppModes.get_by_extension(".bad-ext", True), AppModes.UNKNOWN)
         self.assertIs(AppModes.get_by_extension(None, True), AppModes.UNKNOWN)
 
-        with self.assertRaises(ValueError):
+        with self.assertRaisesRegex(ValueError, "^No app mode with extension: .bad-ext$"):
             AppModes.get_by_extension(".bad-ext")
 
-        with self.assertRaises(ValueError):
+        with self.assertRaisesRegex(ValueError, "^No app mode with extension None$"):
             AppModes.get_by_extension(None)
 
     def test_glob_matcher(self):
@@ -99,6 +128,9 @@ class TestModels(TestCase):
             ("dir/*.txt", "dir/file", False),
             ("dir/*.txt", "dir/file.txt", True),
             ("dir/*.txt", "dir/.txt", True),
+            ("dir/sub/file.txt", os.path.join("dir", "sub", "file.txt"), True),
+            ("dir/sub/file.txt", os.path.join("dir", "sub", "file.csv"), False),
+            ("dir/sub/file.txt", os.path.join("dir", "file.txt"), False),
 
             # recursive wildcard pattern using "/" (input paths using OS separator)
             ("dir/**/*", "dirfile.txt", False),
@@ -111,6 +143,27 @@ class TestModels(TestCase):
             ("dir/**/*.txt", os.path.join("dir", "sub", "a.txt"), True),
             ("dir/**/*.txt", os.path.join("dir", "sub", "a.csv"), False),
 
+            # single-segment wildcards
+            ("file?.txt", "file1.txt", True),
+            ("file?.txt", "file.txt", False),
+            ("file[0-9].txt", "file7.txt", True),
+            ("file[0-9].txt", "filex.txt", False),
+            ("file[!0-9].txt", "filex.txt", True),
+            ("file[!0-9].txt", "file7.txt", False),
+            ("file[]x].txt", "file].txt", True),
+            ("file[.txt", "file[.txt", True),
+            ("*a*a*b", "xaxaxb", True),
+            ("*a*a*b", "aaaa", False),
+
+            # trailing recursive wildcard
+            ("dir/**", "dir", True),
+            ("dir/**", os.path.join("dir", "a.txt"), True),
+            ("dir/**", os.path.join("dir", "sub", "a.txt"), True),
+            ("dir/**", "dirfile.txt", False),
+            ("dir/**", os.path.join("dirother", "a.txt"), False),
+            ("d*/**", os.path.join("dirother", "a.txt"), True),
+            ("d*/**", os.path.join("other", "a.txt"), False),
+
             # recursive wildcards using OS path separator.
             (os.path.join("dir", "**", "*.txt"), os.path.join("dir", "a.txt"), True),
             (os.path.join("dir", "**", "*.txt"), os.path.join("dir", "sub", "a.txt"), True),
@@ -120,6 +173,8 @@ class TestModels(TestCase):
             (os.path.join("dir", "**", "*"), os.path.join("dir", "sub", "sub", "a.bob"), True),
             (os.path.join("dir", "**", "*"), os.path.join("dir", "sub", "z.o"), True),
             (os.path.join("dir", "**", "*"), os.path.join("dir", "abc"), True),
+            (os.path.join("dir", "**", "*"), os.path.join("dirother", "abc"), False),
+            (os.path.join("dir", "**", "*"), "dir", False),
         ]
 
         for pattern, path, expected in cases:
@@ -129,6 +184,105 @@ class TestModels(TestCase):
                 expected,
                 f"pattern: {pattern}; path: {path}; expected: {expected}",
             )
+            self.assertEqual(
+                GlobSet([pattern]).matches(path),
+                expected,
+                f"GlobSet pattern: {pattern}; path: {path}; expected: {expected}",
+            )
 
         with self.assertRaises(ValueError):
             GlobMatcher(os.path.join(".", "blah", "**", "blah", "**", "*.txt"))
+
+    @skipIf(sys.version_info < (3, 9), "fnmatch.translate produces plain '.*' runs before Python 3.9")
+    def test_glob_matcher_multiple_stars_do_not_backtrack(self):
+        # Since Python 3.9, fnmatch.translate emits lookahead groups for each '*'
+        # between literals, which keeps this from taking exponential time.
+        matcher = GlobMatcher("*a*a*a*a*a*a*a*a*b")
+        self.assertFalse(matcher.matches("a" * 60))
+
+    @skipIf(sys.version_info < (3, 9), "fnmatch.translate leaves inverted ranges for re to reject before Python 3.9")
+    def test_glob_matcher_hyphen_ranges(self):
+        # Since Python 3.9, fnmatch.translate drops the inverted "a--" range here.
+        matcher = GlobMatcher("file[a--z].txt")
+        self.assertTrue(matcher.matches("filez.txt"))
+        self.assertFalse(matcher.matches("filem.txt"))
+
+    def test_glob_set_shares_matchers(self):
+        first = GlobSet(["dir/**/*", "*.txt"])
+        second = GlobSet(["*.txt"])
+
+        self.assertIs(first._matchers[1], second._matchers[0])
+        self.assertTrue(second.matches("file.txt"))
+        self.assertFalse(second.matches("file.csv"))
+
+    def test_glob_set_matches_many(self):
+        glob_set = GlobSet(["*.txt", "dir/**/*", "dir/sub/file.csv"])
+        paths = [
+            "file.txt",
+            "file.csv",
+            os.path.join("dir", "a.csv"),
+            os.path.join("other", "sub", "file.csv"),
+        ]
+
+        self.assertEqual(glob_set.matches_many(paths), [True, False, True, False])
+        self.assertEqual(glob_set.matches_many(paths), [glob_set.matches(path) for path in paths])
+        self.assertEqual(glob_set.matches_many([]), [])
+
+    def test_version_search_filter_param_type(self):
+        param_type = VersionSearchFilterParamType("py_version")
+
+        result = param_type.convert(">=3.8.0", None, None)
+        self.assertEqual((result.name, result.comp, result.vers), ("py_version", ">=", "3.8.0"))
+
+        result = param_type.convert("3.11.2-rc.1", None, None)
+        self.assertEqual((result.comp, result.vers), ("==", "3.11.2-rc.1"))
+
+        self.assertIsNot(param_type.convert(">=3.8.0", None, None), param_type.convert(">=3.8.0", None, None))
+
+        hits = _parse_version_filter.cache_info().hits
+        first = param_type.convert("<=3.12.1", None, None)
+        second = VersionSearchFilterParamType("r_version").convert("<=3.12.1", None, None)
+        self.assertGreater(_parse_version_filter.cache_info().hits, hits)
+        self.assertEqual((second.name, second.comp, second.vers), ("r_version", "<=", "3.12.1"))
+        self.assertIsNot(first, second)
+
+        existing = VersionSearchFilter("r_version", "<", "4.0.0")
+        self.assertIs(param_type.convert(existing, None, None), existing)
+
+        for value in ["<>3.8.0", ">=3.8", ">=03.8.0", "=>3.8.0"]:
+            with self.assertRaises(click.BadParameter, msg=value):
+                param_type.convert(value, None, None)
+
+    def test_content_guid_with_bundle_param_type(self):
+        param_type = ContentGuidWithBundleParamType()
+
+        result = param_type.convert("abc-123", None, None)
+        self.assertEqual((result.guid, result.bundle_id), ("abc-123", None))
+
+        result = param_type.convert("'abc-123,42'", None, None)
+        self.assertEqual((result.guid, result.bundle_id), ("abc-123", "42"))
+
+        result = param_type.convert("abc-123,", None, None)
+        self.assertEqual((result.guid, result.bundle_id), ("abc-123", None))
+
+        result = param_type.convert("abc-123,\n5", None, None)
+        self.assertEqual((result.guid, result.bundle_id), ("abc-123", None))
+
+        result = param_type.convert("abc-123,42\nextra", None, None)
+        self.assertEqual((result.guid, result.bundle_id), ("abc-123", "42"))
+
+        existing = ContentGuidWithBundle("abc-123", "7")
+        self.assertIs(param_type.convert(existing, None, None), existing)
+
+        with self.assertRaises(click.BadParameter):
+            param_type.convert("abc-123,not-a-number", None, None)
+
+    def test_build_status(self):
+        self.assertEqual(BuildStatus("COMPLETE"), BuildStatus.COMPLETE)
+        self.assertEqual(BuildStatus.COMPLETE, "COMPLETE")
+        self.assertEqual(str(BuildStatus.NEEDS_BUILD), "NEEDS_BUILD")
+        self.assertEqual(json.dumps(BuildStatus.ERROR), '"ERROR"')
+        self.assertIn("RUNNING", BuildStatus.__members__)
+
+        with self.assertRaises(ValueError):
+            BuildStatus("UNKNOWN")